@@ -1,206 +1,492 @@
-import csv
-import random
-
-
-print('-'*50)
-
-print('*'*50)
-
-print('\tBank Management Software -by Om')
-
-print('Hello Bahini')
-
-print('*'*50)
-
-print('-'*50)
-
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+from itertools import count, repeat
+import mmap
+import os
+import pickle
+import sys
+
+
+# Account state is stored column-wise: `accounts` maps an account number to
+# its row, and every row indexes the parallel `balances`, `transaction_ops`
+# and `transaction_amounts` columns. Rows are handed out in insertion order
+# and never removed, so iterating `accounts` walks the columns in order.
+# All money is held as integer paise and only formatted as rupees for display.
 accounts = {}
-
-
-def rand():
-
-    num = random.randint(100000, 999999)
-    return num
+balances = array('q')
+transaction_ops = []
+transaction_amounts = []
+# Sum of `balances`, kept up to date by every balance change.
+bank_total = 0
+
+# Account numbers changed since the last save, and how many account records
+# the journal holds on top of the last full snapshot. Each snapshot gets a new
+# generation number and journal records are tagged with the generation they
+# extend, so records left over from before a compaction are never replayed.
+dirty = set()
+journal_rows = 0
+generation = 0
+
+DATA_FILE = 'bank_data1.pkl'
+JOURNAL_FILE = 'bank_data1.journal'
+LEGACY_DATA_FILE = 'bank_data1.csv'
+BUFFER_SIZE = 1024 * 1024
+# Legacy CSV files at least this large are parsed across worker processes.
+PARALLEL_IMPORT_SIZE = 8 * 1024 * 1024
+
+# Transactions are kept per account as two parallel arrays: an op code
+# ('b') and an amount in paise ('q'). They are turned into text only when
+# printed.
+DEPOSIT, WITHDRAW = 0, 1
+TRANSACTION_LABELS = ('Deposited Rs', 'Withdrew Rs')
+
+MENU = "\n".join([
+    '-'*50,
+    "\nMain Menu:",
+    '-'*50,
+    "1. Add account",
+    "2. Check balance",
+    "3. Deposit",
+    "4. Withdraw",
+    "5. Display all accounts",
+    "6. Print bank statement",
+    "7. Quit\n",
+]) + "\n"
+STATEMENT_RULE = '-'*60
+
+# Account numbers are handed out in sequence, starting after the highest
+# number already in use, so a new number can never collide with an old one.
+account_numbers = count(100000)
+
+# Every amount and balance must fit the signed 64-bit 'q' columns.
+PAISE_MIN, PAISE_MAX = -2**63, 2**63 - 1
+
+
+def to_paise(text):
+
+  # Parse a rupee amount exactly, rounded to the nearest paisa.
+  try:
+    rupees = Decimal(text.strip()).quantize(Decimal('0.01'))
+  except InvalidOperation:
+    raise ValueError(f'invalid amount: {text!r}') from None
+  if not rupees.is_finite():
+    raise ValueError(f'invalid amount: {text!r}')
+  return int(rupees * 100)
+
+
+def to_stored_paise(text):
+
+  # Parse an amount read back from a file, which must fit the 'q' columns.
+  paise = to_paise(text)
+  if not PAISE_MIN <= paise <= PAISE_MAX:
+    raise ValueError(f'amount out of range: {text!r}')
+  return paise
+
+
+def format_money(paise):
+
+  rupees, rest = divmod(abs(paise), 100)
+  return f"{'-' if paise < 0 else ''}{rupees}.{rest:02d}"
+
+
+def add_row(balance, ops, amounts):
+
+  balances.append(balance)
+  transaction_ops.append(ops)
+  transaction_amounts.append(amounts)
+  return len(balances) - 1
 
 
 def add_account(balance):
 
-  account_num = str(rand())
+  global bank_total
+  account_num = sys.intern(str(next(account_numbers)))
   print(f'Your Account Number is: {account_num}')
-  accounts[account_num] = (balance, [])
+  accounts[account_num] = add_row(balance, array('b'), array('q'))
+  dirty.add(account_num)
+  bank_total += balance
   print('Operation Done Successfully.\n')
 
 
 def check_balance(account_num):
 
-  if account_num not in accounts:
+  row = accounts.get(account_num)
+  if row is None:
     print("Error: Account does not exist")
 
   else:
-    balance = accounts[account_num][0]
-    print(f"Balance: {balance}")
+    print(f"Balance: {format_money(balances[row])}")
 
   print('Operation Done Successfully.\n')
 
 
 def deposit(account_num, amount):
 
-  if account_num not in accounts:
+  global bank_total
+  row = accounts.get(account_num)
+  if row is None:
     print("Error: Account does not exist")
 
+  elif balances[row] + amount > PAISE_MAX:
+    print("Error: Balance limit exceeded")
+
   else:
-    balance = accounts[account_num][0]
-    transaction_history = accounts[account_num][1]
-    accounts[account_num] = (balance + amount, transaction_history)
-    transaction_history.append(f"Deposited Rs{amount}")
-    balance = accounts[account_num][0]
-    print(f'Current Balance: {balance}')
+    balances[row] += amount
+    bank_total += amount
+    transaction_ops[row].append(DEPOSIT)
+    transaction_amounts[row].append(amount)
+    dirty.add(account_num)
+    print(f'Current Balance: {format_money(balances[row])}')
 
   print('Operation Done Successfully.\n')
 
 def withdraw(account_num, amount):
 
-  if account_num not in accounts:
+  global bank_total
+  row = accounts.get(account_num)
+  if row is None:
     print("Error: Account does not exist")
 
   else:
-    balance = accounts[account_num][0]
-    transaction_history = accounts[account_num][1]
-
-    if balance < amount:
+    if balances[row] < amount:
       print("Error: Insufficient balance")
-      balance = accounts[account_num][0]
-      print(f'Current Balance: {balance}')
+      print(f'Current Balance: {format_money(balances[row])}')
 
     else:
-      accounts[account_num] = (balance - amount, transaction_history)
-      transaction_history.append(f"Withdrew Rs{amount}")
-      balance = accounts[account_num][0]
-      print(f'Current Balance: {balance}')
+      balances[row] -= amount
+      bank_total -= amount
+      transaction_ops[row].append(WITHDRAW)
+      transaction_amounts[row].append(amount)
+      dirty.add(account_num)
+      print(f'Current Balance: {format_money(balances[row])}')
 
   print('Operation Done Successfully.\n')
 
 def display_all():
-  bal=0
 
-  print('Account| Balance')
-  for account_num, (balance, _) in accounts.items():
-    bal=bal+balance
-    print(f"{account_num} | {balance}")
-  print(f'Total Amount in Bank= {bal}')
-  print('Operation Done Successfully.\n')
+  lines = ['Account| Balance']
+  lines.extend(f"{account_num} | {format_money(balance)}" for account_num, balance in zip(accounts, balances))
+  lines.append(f'Total Amount in Bank= {format_money(bank_total)}')
+  lines.append('Operation Done Successfully.\n')
+  sys.stdout.write("\n".join(lines) + "\n")
   
 
 
 def print_bank_statement(account_num):
 
-  if account_num not in accounts:
+  row = accounts.get(account_num)
+  if row is None:
     print("Error: Account does not exist")
+    print('Operation Done Successfully.\n')
     
   else:
       
-    balance = accounts[account_num][0]
-    transaction_history = accounts[account_num][1]
-    print(f"Bank statement for account {account_num}:")
-    print(f"Balance: {balance}")
-    print("Transaction history:")
-    
-    print('-'*60)
-    
-    
-    balance = accounts[account_num][0]
-    print(f'Current Balance: {balance}')
+    balance = format_money(balances[row])
+    lines = [
+      f"Bank statement for account {account_num}:",
+      f"Balance: {balance}",
+      "Transaction history:",
+      STATEMENT_RULE,
+      f'Current Balance: {balance}',
+      *format_transactions(transaction_ops[row], transaction_amounts[row]),
+      'Operation Done Successfully.\n',
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def format_transactions(ops, amounts):
+
+  return [f"{TRANSACTION_LABELS[op]}{format_money(amount)}" for op, amount in zip(ops, amounts)]
+
+
+def parse_transactions(entries):
+
+  ops = array('b')
+  amounts = array('q')
+  for entry in entries:
+    for op, label in enumerate(TRANSACTION_LABELS):
+      if entry.startswith(label):
+        ops.append(op)
+        amounts.append(to_stored_paise(entry[len(label):]))
+        break
+  return ops, amounts
+
+
+def parse_csv_range(path, start, end):
+
+  # Parse the lines of a legacy CSV file that start in [start, end). Both
+  # offsets must fall on line boundaries. Returns the parsed rows and the
+  # (account number, reason) of every row that could not be imported.
+  rows = []
+  skipped = []
+  with open(path, 'rb') as file:
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      mm.seek(start)
+      while mm.tell() < end:
+        # Older files were written through csv.writer, which quoted the
+        # joined history field; transactions never contain quotes.
+        parts = mm.readline().rstrip(b'\r\n').replace(b'"', b'').decode().split(',')
+        if not parts[0]:
+          continue
+        try:
+          if len(parts) < 2:
+            raise ValueError('missing balance')
+          rows.append((parts[0], to_stored_paise(parts[1]), *parse_transactions(parts[2:])))
+        except ValueError as error:
+          skipped.append((parts[0], str(error)))
+  return rows, skipped
+
+
+def import_csv():
+
+  # Read the account table from the CSV format used before DATA_FILE. The
+  # file is memory-mapped and parsed in place; large files are split into
+  # newline-aligned byte ranges that are parsed in parallel.
+  with open(LEGACY_DATA_FILE, 'rb') as file:
+    size = os.fstat(file.fileno()).st_size
+    if not size:
+      return
+    workers = (os.cpu_count() or 1) if size >= PARALLEL_IMPORT_SIZE else 1
+    bounds = [0]
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      for i in range(1, workers):
+        newline = mm.find(b'\n', max(bounds[-1], size * i // workers))
+        if newline == -1:
+          break
+        bounds.append(newline + 1)
+    bounds.append(size)
 
-    for transaction in transaction_history:
-      print(transaction)
-  print('Operation Done Successfully.\n')
+  if len(bounds) > 2:
+    with ProcessPoolExecutor(len(bounds) - 1) as executor:
+      chunks = list(executor.map(parse_csv_range, repeat(LEGACY_DATA_FILE), bounds, bounds[1:]))
+  else:
+    chunks = [parse_csv_range(LEGACY_DATA_FILE, 0, size)]
+
+  for rows, skipped in chunks:
+    for account_num, balance, ops, amounts in rows:
+      accounts[sys.intern(account_num)] = add_row(balance, ops, amounts)
+    for account_num, reason in skipped:
+      print(f'Skipped account {account_num} from {LEGACY_DATA_FILE}: {reason}')
+
+
+def replay_journal():
+
+  # Apply the account records appended by save_data since the last snapshot.
+  global journal_rows
+  try:
+    file = open(JOURNAL_FILE, 'rb', buffering=BUFFER_SIZE)
+  except FileNotFoundError:
+    return
+  with file:
+    while True:
+      offset = file.tell()
+      try:
+        record_generation, changes = pickle.load(file)
+      except (EOFError, pickle.UnpicklingError):
+        break
+      if record_generation != generation:
+        continue
+      for account_num, (balance, ops, amounts) in changes.items():
+        row = accounts.get(account_num)
+        if row is None:
+          accounts[sys.intern(account_num)] = add_row(balance, ops, amounts)
+        else:
+          balances[row] = balance
+          transaction_ops[row] = ops
+          transaction_amounts[row] = amounts
+      journal_rows += len(changes)
+    size = os.fstat(file.fileno()).st_size
+
+  # A crash part-way through a save leaves a torn final record. Cut it off so
+  # the next save does not append after it.
+  if offset < size:
+    with open(JOURNAL_FILE, 'r+b') as file:
+      file.truncate(offset)
+      sync(file)
+    print('Discarded an incomplete record at the end of the journal.')
 
 
 def load_data():
 
-  global accounts
-  with open('bank_data1.csv', 'r') as file:
-    reader = csv.reader(file)
-    accounts = {row[0]: (float(row[1]), row[2:]) for row in reader}
+  global accounts, balances, transaction_ops, transaction_amounts, journal_rows, bank_total
+  global account_numbers, generation
+  accounts = {}
+  balances = array('q')
+  transaction_ops = []
+  transaction_amounts = []
+  journal_rows = 0
+  generation = 0
+  bank_total = 0
+  account_numbers = count(100000)
+  dirty.clear()
+  try:
+    with open(DATA_FILE, 'rb', buffering=BUFFER_SIZE) as file:
+      generation, accounts, balances, transaction_ops, transaction_amounts = pickle.load(file)
+    accounts = {sys.intern(account_num): row for account_num, row in accounts.items()}
+  except FileNotFoundError:
+    import_csv()
+  replay_journal()
+  bank_total = sum(balances)
+  account_numbers = count(max((int(n) for n in accounts if n.isdecimal()), default=99999) + 1)
   print('\nLoading Data...')
   print('Operation Done Successfully.\n')
     
   
+def sync(file):
+
+  # save_data only runs on Quit, so each save costs one fsync per file it
+  # touches.
+  file.flush()
+  os.fsync(file.fileno())
+
+
+def sync_dir(path):
+
+  # Make a rename or newly created file in `path`'s directory durable.
+  # Windows cannot open directories, and NTFS journals renames itself.
+  if os.name != 'posix':
+    return
+  fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+  try:
+    os.fsync(fd)
+  finally:
+    os.close(fd)
+
+
 def save_data():
-   with open('bank_data1.csv', 'w', newline='') as file:
-       writer = csv.writer(file)
-       for account_num, (balance, transaction_history) in accounts.items():
-           transaction_history_str = ','.join(transaction_history)
-           writer.writerow([account_num, balance, transaction_history_str])
+   # Only accounts in `dirty` are written, appended to the journal. Once the
+   # journal would hold more records than there are accounts (or there is no
+   # snapshot yet) everything is compacted into a fresh snapshot instead.
+   global journal_rows, generation
+   if dirty and os.path.exists(DATA_FILE) and journal_rows + len(dirty) <= len(accounts):
+       changes = {}
+       # Journal in row order so replay re-creates new accounts in order.
+       for account_num in sorted(dirty, key=accounts.__getitem__):
+           row = accounts[account_num]
+           changes[account_num] = (balances[row], transaction_ops[row], transaction_amounts[row])
+       created = not os.path.exists(JOURNAL_FILE)
+       with open(JOURNAL_FILE, 'ab', buffering=BUFFER_SIZE) as file:
+           pickle.dump((generation, changes), file, pickle.HIGHEST_PROTOCOL)
+           sync(file)
+       if created:
+           sync_dir(JOURNAL_FILE)
+       journal_rows += len(changes)
+   elif dirty or not os.path.exists(DATA_FILE):
+       with open(DATA_FILE + '.tmp', 'wb', buffering=BUFFER_SIZE) as file:
+           pickle.dump((generation + 1, accounts, balances, transaction_ops, transaction_amounts),
+                       file, pickle.HIGHEST_PROTOCOL)
+           sync(file)
+       os.replace(DATA_FILE + '.tmp', DATA_FILE)
+       generation += 1
+       with open(JOURNAL_FILE, 'wb') as file:
+           sync(file)
+       sync_dir(DATA_FILE)
+       journal_rows = 0
+   dirty.clear()
    print('Data Saved Successfully.\n')
 
 
-def main():
-    a = 'y'
-    while a=='y':
-        
-        print('-'*50)
-        
-        print("\nMain Menu:")
-        print('-'*50)
-        print("1. Add account")
-        print("2. Check balance")
-        print("3. Deposit")
-        print("4. Withdraw")
-        print("5. Display all accounts")
-        print("6. Print bank statement")
-        print("7. Quit\n")
+def input_account_num():
 
-        
-        choice = input("\nEnter your choice: ")
+  # Account numbers are interned dict keys, so lookups compare by identity.
+  return sys.intern(input("Enter account number: ").strip())
 
-        
-        if choice == '1':
-          balance = float(input("Enter initial balance: "))
-          add_account(balance)
 
-        elif choice == '2':
-          account_num = input("Enter account number: ")
-          check_balance(account_num)
+def input_amount(prompt, allow_zero=False):
 
-        
-        elif choice == '3':
-          account_num = input("Enter account number: ")
-          amount = float(input("Enter amount to deposit: "))
-          deposit(account_num, amount)
+  while True:
+    try:
+      amount = to_paise(input(prompt))
+    except ValueError:
+      print("Error: Invalid amount")
+      continue
+    if amount < 0 or amount == 0 and not allow_zero:
+      print("Error: Amount must be positive")
+    elif amount > PAISE_MAX:
+      print("Error: Amount too large")
+    else:
+      return amount
 
-        
-        elif choice == '4':
-          account_num = input("Enter account number: ")
-          amount = float(input("Enter amount to withdraw: "))
-          withdraw(account_num, amount)
 
-        
-        elif choice == '5':
-          display_all()
+def handle_add_account():
+  balance = input_amount("Enter initial balance: ", allow_zero=True)
+  add_account(balance)
+
+
+def handle_check_balance():
+  account_num = input_account_num()
+  check_balance(account_num)
+
+
+def handle_deposit():
+  account_num = input_account_num()
+  amount = input_amount("Enter amount to deposit: ")
+  deposit(account_num, amount)
+
+
+def handle_withdraw():
+  account_num = input_account_num()
+  amount = input_amount("Enter amount to withdraw: ")
+  withdraw(account_num, amount)
+
+
+def handle_statement():
+  account_num = input_account_num()
+  print_bank_statement(account_num)
+
+
+def handle_quit():
+  save_data()
+  return True
+
+
+# Menu choice -> handler. A handler returns True to leave the menu loop.
+HANDLERS = {
+    '1': handle_add_account,
+    '2': handle_check_balance,
+    '3': handle_deposit,
+    '4': handle_withdraw,
+    '5': display_all,
+    '6': handle_statement,
+    '7': handle_quit,
+}
+
 
+def main():
+    while True:
         
-        elif choice == '6':
-          account_num = input("Enter account number: ")
-          print_bank_statement(account_num)
+        sys.stdout.write(MENU)
 
-      
-        elif choice == '7':
-          
-          save_data()
-          break
+        
+        choice = input("\nEnter your choice: ")
 
-        else:
+        handler = HANDLERS.get(choice)
+        if handler is None:
           print("Error: Invalid choice\n")
-          
+        elif handler():
+          break
           
         
-try:
-    load_data()
-    main()
+if __name__ == '__main__':
+
+    print('-'*50)
+
+    print('*'*50)
+
+    print('\tBank Management Software -by Om')
+
+    print('Hello Bahini')
+
+    print('*'*50)
+
+    print('-'*50)
 
+    try:
+        load_data()
+    except FileNotFoundError:
+        pass
 
-except:
     main()
     
     
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+
+
+class BankDataTest(unittest.TestCase):
+
+  def setUp(self):
+    self.cwd = os.getcwd()
+    self.tmp = tempfile.TemporaryDirectory()
+    os.chdir(self.tmp.name)
+    self.addCleanup(self.tmp.cleanup)
+    self.addCleanup(os.chdir, self.cwd)
+    self.out = io.StringIO()
+    stdout = contextlib.redirect_stdout(self.out)
+    stdout.__enter__()
+    self.addCleanup(stdout.__exit__, None, None, None)
+
+  def load(self):
+    try:
+      main.load_data()
+    except FileNotFoundError:
+      pass
+
+  def balance(self, account_num):
+    return main.balances[main.accounts[account_num]]
+
+  def test_truncated_journal_record_is_discarded(self):
+    self.load()
+    for _ in range(4):
+      main.add_account(100)
+    main.save_data()
+    main.deposit('100000', 5)
+    main.save_data()
+    good_size = os.path.getsize(main.JOURNAL_FILE)
+    main.deposit('100000', 7)
+    main.save_data()
+    with open(main.JOURNAL_FILE, 'r+b') as file:
+      file.truncate(os.path.getsize(main.JOURNAL_FILE) - 5)
+
+    self.load()
+    self.assertEqual(self.balance('100000'), 105)
+    self.assertEqual(os.path.getsize(main.JOURNAL_FILE), good_size)
+
+    main.deposit('100000', 1)
+    main.save_data()
+    self.load()
+    self.assertEqual(self.balance('100000'), 106)
+
+  def test_reload_keeps_account_order(self):
+    self.load()
+    for _ in range(4):
+      main.add_account(100)
+    main.save_data()
+    for _ in range(3):
+      main.add_account(50)
+    main.save_data()
+
+    self.load()
+    self.assertEqual(list(main.accounts), [str(n) for n in range(100000, 100007)])
+
+  def test_legacy_csv_skips_unstorable_rows(self):
+    with open(main.LEGACY_DATA_FILE, 'w') as file:
+      file.write('111111,inf,\n'
+                 '222222,1e+20,\n'
+                 '333333,12.5,"Deposited Rs2.5,Withdrew Rs1.0"\n'
+                 '444444,nan,\n'
+                 '555555,1.0,"Deposited Rs1e+20"\n'
+                 '666666\n')
+    self.load()
+    self.assertEqual(list(main.accounts), ['333333'])
+    self.assertEqual(self.balance('333333'), 1250)
+    self.assertEqual(list(main.transaction_amounts[0]), [250, 100])
+    for account_num in ('111111', '222222', '444444', '555555', '666666'):
+      self.assertIn(f'Skipped account {account_num}', self.out.getvalue())
+
+  def test_input_amount_rejects_non_positive_amounts(self):
+    with mock.patch('builtins.input', side_effect=['-5', '0', '2.50']):
+      self.assertEqual(main.input_amount('Amount: '), 250)
+    self.assertEqual(self.out.getvalue().count('Error: Amount must be positive'), 2)
+    with mock.patch('builtins.input', side_effect=['-1', '0']):
+      self.assertEqual(main.input_amount('Amount: ', allow_zero=True), 0)
+
+
+if __name__ == '__main__':
+  unittest.main()